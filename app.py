@@ -1,18 +1,43 @@
-import streamlit as st
-from utils.transcribe import AudioTranscriber
-from utils.extract_info import InfoExtractor
-from qa_system import QASystem
 import tempfile
+import importlib.util
+import shutil
 import os
-import torch
+import time
+from concurrent.futures import ThreadPoolExecutor
 import logging
 from typing import Optional, Dict, Any
 
 # --------------------------
 # CONFIGURATION
 # --------------------------
+# Hugging Face libraries read these at import time, so set them before importing models
 os.environ['HF_HUB_DISABLE_SYMLINKS_WARNING'] = '1'  # Disable symlink warnings
+if importlib.util.find_spec('hf_transfer'):
+    os.environ.setdefault('HF_HUB_ENABLE_HF_TRANSFER', '1')  # Faster first-time downloads
 CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'hf_models')
+SPECULATIVE_DECODING = os.getenv('SPECULATIVE_DECODING') == '1'
+NER_MODEL_PATH = os.getenv('NER_MODEL_PATH')
+
+# The marker lives in the Hugging Face hub cache itself, so clearing the cache clears it too
+HF_HUB_CACHE = os.getenv('HF_HUB_CACHE') or os.path.join(
+    os.getenv('HF_HOME') or os.path.join(os.path.expanduser('~'), '.cache', 'huggingface'),
+    'hub'
+)
+MODELS_READY_MARKER = os.path.join(HF_HUB_CACHE, '.speech_analyzer_models_ready')
+OFFLINE_VARS = ('TRANSFORMERS_OFFLINE', 'HF_HUB_OFFLINE')
+
+# Once every model has been downloaded and loaded, skip hub lookups on startup
+OFFLINE_FROM_MARKER = (os.path.exists(MODELS_READY_MARKER)
+                       and not any(var in os.environ for var in OFFLINE_VARS))
+if OFFLINE_FROM_MARKER:
+    for var in OFFLINE_VARS:
+        os.environ[var] = '1'
+
+import streamlit as st
+from utils.transcribe import AudioTranscriber, PROGRESS_MIN_INTERVAL
+from utils.extract_info import InfoExtractor
+from qa_system import QASystem
+import torch
 
 # configure logging
 logging.basicConfig(
@@ -25,18 +50,80 @@ logger = logging.getLogger(__name__)
 # --------------------------
 # CORE FUNCTIONS
 # --------------------------
+def _load_all_models() -> Dict[str, Any]:
+    """Construct every model; loads are dominated by disk/network I/O, so run them concurrently"""
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        transcriber_future = executor.submit(
+            AudioTranscriber, "base", speculative=SPECULATIVE_DECODING  # only applies on CUDA
+        )
+        extractor_future = executor.submit(InfoExtractor, ner_model_path=NER_MODEL_PATH)
+        qa_future = executor.submit(QASystem)
+        
+        transcriber = transcriber_future.result()
+        transcriber.set_progress_callback(lambda p: None)  # Initialize empty callback
+        return {
+            "transcriber": transcriber,
+            "extractor": extractor_future.result(),
+            "qa": qa_future.result()
+        }
+
+def _all_backends_loaded(models: Dict[str, Any]) -> bool:
+    """Check that no requested backend quietly fell back to a default"""
+    transcriber = models["transcriber"]
+    if SPECULATIVE_DECODING and transcriber.device == "cuda" and transcriber.backend != "transformers":
+        return False
+    if NER_MODEL_PATH and models["extractor"].ner is None:
+        return False
+    return True
+
+def _set_models_ready(ready: bool):
+    """Write or remove the marker that lets later starts run offline"""
+    try:
+        if ready:
+            os.makedirs(HF_HUB_CACHE, exist_ok=True)
+            open(MODELS_READY_MARKER, 'a').close()
+        elif os.path.exists(MODELS_READY_MARKER):
+            os.unlink(MODELS_READY_MARKER)
+    except OSError as e:
+        logger.warning(f"Could not update model cache marker: {e}")
+
+def _disable_offline_mode():
+    """Re-enable hub access after an offline load found the cache incomplete"""
+    for var in OFFLINE_VARS:
+        os.environ.pop(var, None)
+    # Both libraries cache the flag at import time
+    import huggingface_hub.constants
+    huggingface_hub.constants.HF_HUB_OFFLINE = False
+    try:
+        import transformers.utils.hub
+        transformers.utils.hub._is_offline_mode = False
+    except ImportError:
+        pass
+
 @st.cache_resource(show_spinner=False)
 def load_models() -> Optional[Dict[str, Any]]:
     """Initialize and cache all AI models with comprehensive error handling"""
     try:
         logger.info("Loading models...")
-        transcriber = AudioTranscriber("base")
-        transcriber.set_progress_callback(lambda p: None)  # Initialize empty callback
-        return {
-            "transcriber": transcriber,
-            "extractor": InfoExtractor(),
-            "qa": QASystem()
-        }
+        try:
+            models = _load_all_models()
+            complete = _all_backends_loaded(models)
+        except Exception as e:
+            if not OFFLINE_FROM_MARKER:
+                raise
+            logger.warning(f"Offline model load failed: {e}")
+            complete = False
+        
+        if not complete and OFFLINE_FROM_MARKER:
+            # Cache was cleared or a backend was never downloaded: retry once with hub access
+            logger.info("Model cache incomplete, retrying with hub access")
+            _set_models_ready(False)
+            _disable_offline_mode()
+            models = _load_all_models()
+            complete = _all_backends_loaded(models)
+        
+        _set_models_ready(complete)
+        return models
     except Exception as e:
         logger.error(f"Model loading failed: {str(e)}", exc_info=True)
         st.error("""
@@ -51,13 +138,11 @@ def load_models() -> Optional[Dict[str, Any]]:
 def save_uploaded_file(uploaded_file) -> Optional[str]:
     """Safely handle file uploads with validation"""
     try:
-        # Create dedicated temp directory
-        temp_dir = tempfile.mkdtemp(prefix="audio_")
-        audio_path = os.path.join(temp_dir, f"audio_input_{os.urandom(4).hex()}.mp3")
-        
-        # Write with verification
-        with open(audio_path, 'wb') as f:
-            f.write(uploaded_file.getbuffer())
+        # Stream to a uniquely named temp file in 1 MiB chunks
+        uploaded_file.seek(0)
+        with tempfile.NamedTemporaryFile(prefix="audio_input_", suffix=".mp3", delete=False) as f:
+            audio_path = f.name
+            shutil.copyfileobj(uploaded_file, f, length=1024 * 1024)
         
         # Validate file
         if os.path.getsize(audio_path) == 0:
@@ -73,9 +158,8 @@ def save_uploaded_file(uploaded_file) -> Optional[str]:
 
 def transcribe_audio(models: Dict[str, Any], audio_path: str) -> Optional[str]:
     """Robust audio transcription with progress tracking"""
+    progress_bar = st.progress(0)
     try:
-        progress_bar = st.progress(0)
-        
         def progress_callback(progress: float):
             """Handle progress updates for Streamlit"""
             progress_bar.progress(min(1.0, max(0.0, progress)))
@@ -84,13 +168,23 @@ def transcribe_audio(models: Dict[str, Any], audio_path: str) -> Optional[str]:
         models["transcriber"].set_progress_callback(progress_callback)
         
         with st.spinner("🔊 Processing audio (this may take a few minutes)..."):
-            result = models["transcriber"].transcribe(audio_path)
-            progress_bar.progress(1.0)
-            return result
+            # Show text as segments are decoded instead of waiting for the full transcript
+            # Plain text (not markdown) so "$" or "#" in speech renders as spoken,
+            # refreshed at the progress throttle interval rather than per segment
+            placeholder = st.empty()
+            parts = []
+            last_render = 0.0
+            for _, text in models["transcriber"].transcribe_iter(audio_path):
+                parts.append(text)
+                now = time.monotonic()
+                if now - last_render >= PROGRESS_MIN_INTERVAL:
+                    placeholder.text("".join(parts))
+                    last_render = now
+            placeholder.empty()  # Full transcript is shown in the editor
+            return "".join(parts)
             
     except Exception as e:
         logger.error(f"Transcription failed: {str(e)}", exc_info=True)
-        progress_bar.progress(1.0)  # Ensure progress bar completes
         st.error(f"""
         🚨 Transcription Error:
         {str(e)}
@@ -101,6 +195,8 @@ def transcribe_audio(models: Dict[str, Any], audio_path: str) -> Optional[str]:
         3. Different file format
         """)
         return None
+    finally:
+        progress_bar.progress(1.0)  # Ensure progress bar completes
 
 # --------------------------
 # UI COMPONENTS
@@ -230,9 +326,6 @@ def main():
             try:
                 if audio_path and os.path.exists(audio_path):
                     os.unlink(audio_path)
-                    temp_dir = os.path.dirname(audio_path)
-                    if os.path.exists(temp_dir):
-                        os.rmdir(temp_dir)
             except Exception as e:
                 logger.warning(f"Cleanup warning: {str(e)}")
 
@@ -1,38 +1,87 @@
-from haystack import Pipeline, Document
-from haystack.nodes import EmbeddingRetriever, FARMReader
+from haystack import Document
+from haystack.document_stores import InMemoryDocumentStore
+from haystack.nodes import EmbeddingRetriever, FARMReader, PreProcessor
+from collections import OrderedDict
 from typing import Optional
+import hashlib
 import logging
+import threading
+import torch
 
 logger = logging.getLogger(__name__)
 
+DOC_CACHE_SIZE = 8  # embedded transcripts kept for follow-up questions
+
 class QASystem:
     def __init__(self):
         # Updated EmbeddingRetriever initialization
         self.retriever = EmbeddingRetriever(
             embedding_model="sentence-transformers/all-MiniLM-L6-v2",
             model_format="sentence_transformers",
+            top_k=3,
             progress_bar=False
         )
         
         self.reader = FARMReader(
             model_name_or_path="deepset/roberta-base-squad2",
-            use_gpu=False
+            use_gpu=False,
+            top_k=1
         )
+        self._quantize_reader()
         
-        self.pipeline = self._build_pipeline()
+        # Overlapping ~200 word windows so retrieval narrows the reader's context
+        self.preprocessor = PreProcessor(
+            split_by="word",
+            split_length=200,
+            split_overlap=40,
+            split_respect_sentence_boundary=True,
+            progress_bar=False
+        )
+        
+        # Shared across Streamlit sessions, so the cache is LRU-bounded and locked
+        self._doc_cache: "OrderedDict[str, InMemoryDocumentStore]" = OrderedDict()
+        self._doc_cache_lock = threading.Lock()
 
-    def _build_pipeline(self) -> Pipeline:
-        """Build Haystack QA pipeline."""
-        pipeline = Pipeline()
-        pipeline.add_node(component=self.retriever, name="Retriever", inputs=["Query"])
-        pipeline.add_node(component=self.reader, name="Reader", inputs=["Retriever"])
-        return pipeline
+    def _quantize_reader(self):
+        """Apply INT8 dynamic quantization to the reader's linear layers (CPU inference)."""
+        try:
+            self.reader.inferencer.model = torch.quantization.quantize_dynamic(
+                self.reader.inferencer.model,
+                {torch.nn.Linear},
+                dtype=torch.qint8,
+                inplace=True
+            )
+            logger.info("Reader quantized to INT8")
+        except Exception as e:
+            logger.warning(f"Reader quantization failed, using FP32: {e}")
+
+    def _get_document_store(self, text: str) -> InMemoryDocumentStore:
+        """Return an embedded document store for text, reusing it across questions."""
+        key = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+        with self._doc_cache_lock:
+            store = self._doc_cache.get(key)
+            if store is not None:
+                self._doc_cache.move_to_end(key)
+                return store
+        
+        store = InMemoryDocumentStore(embedding_dim=384)
+        store.write_documents(self.preprocessor.process([Document(content=text)]))
+        store.update_embeddings(self.retriever)
+        
+        with self._doc_cache_lock:
+            self._doc_cache[key] = store
+            self._doc_cache.move_to_end(key)
+            while len(self._doc_cache) > DOC_CACHE_SIZE:
+                self._doc_cache.popitem(last=False)
+        return store
 
     def answer(self, text: str, question: str) -> Optional[str]:
         """Answer question about given text."""
         try:
-            doc = Document(content=text)
-            result = self.pipeline.run(query=question, documents=[doc])
+            # Pass the store per call rather than setting it on the shared retriever
+            store = self._get_document_store(text)
+            docs = self.retriever.retrieve(query=question, document_store=store)
+            result = self.reader.predict(query=question, documents=docs)
             return result["answers"][0].answer if result["answers"] else None
         except Exception as e:
             logger.error(f"QA failed: {e}")
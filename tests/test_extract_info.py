@@ -0,0 +1,37 @@
+import pytest
+
+pytest.importorskip("spacy")
+
+from utils.extract_info import CONTACT_RE, split_phones
+
+
+def phones_in(text):
+    """Run the phone half of InfoExtractor.extract without loading spaCy models."""
+    return [
+        phone
+        for match in CONTACT_RE.finditer(text)
+        if match.lastgroup == "phone"
+        for phone in split_phones(match.group())
+    ]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Call (123) 456-7890 or email john@example.com", ["(123) 456-7890"]),
+    ("+44 20 7946 0958", ["+44 20 7946 0958"]),
+    ("numbers 555 123 4567 555 987 6543", ["555 123 4567", "555 987 6543"]),
+    ("555 123 4567\n555 987 6543", ["555 123 4567", "555 987 6543"]),
+    ("555-123-4567-555-987-6543", ["555-123-4567", "555-987-6543"]),
+    ("555 123 4567 89 555 987 6543", ["555 123 4567", "555 987 6543"]),
+    ("+1 555 123 4567 +1 555 987 6543", ["+1 555 123 4567", "+1 555 987 6543"]),
+])
+def test_phones_are_split_into_valid_numbers(text, expected):
+    assert phones_in(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "12345678901234567890",
+    "1234 5678 9012 3456",
+    "123 456 78",
+])
+def test_non_phone_digit_runs_are_dropped(text):
+    assert phones_in(text) == []
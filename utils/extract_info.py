@@ -1,9 +1,68 @@
 #info extraction
 import re
+import logging
 import spacy
-from typing import Dict, List
+from typing import Dict, List, Optional
 from dataclasses import dataclass
 
+# Separators are single spaces/tabs so numbers on separate lines or after a pause don't merge
+PHONE_PATTERN = r'[\+\(]?[0-9](?:[0-9\-\(\)]|[ \t](?![ \t])){8,}[0-9]'
+EMAIL_PATTERN = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
+
+# Compiled once per process; single alternation so phones and emails are found in one scan
+CONTACT_RE = re.compile(f'(?P<email>{EMAIL_PATTERN})|(?P<phone>{PHONE_PATTERN})')
+NON_DIGIT_RE = re.compile(r'\D')
+PHONE_GROUP_RE = re.compile(r'[\+\(]?[0-9]+')  # digit groups, keeping a leading '+' or '('
+SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+')
+
+logger = logging.getLogger(__name__)
+
+# E.164 numbers have at most 15 digits; fewer than 10 is not a full number
+MIN_PHONE_DIGITS = 10
+MAX_PHONE_DIGITS = 15
+
+def normalize_phone(phone: str) -> str:
+    """Strip a phone match down to its digits."""
+    return NON_DIGIT_RE.sub('', phone)
+
+def is_valid_phone(phone: str) -> bool:
+    """Check that a phone match has a plausible number of digits."""
+    return MIN_PHONE_DIGITS <= len(normalize_phone(phone)) <= MAX_PHONE_DIGITS
+
+def split_phones(phone: str) -> List[str]:
+    """Split a match that ran several spoken numbers together into valid numbers.
+    
+    Digit groups (separated by spaces, '-', '(' or ')') are partitioned into as many
+    10-15 digit numbers as possible, preferring to drop stray fragments between them
+    over gluing fragments on. Groups opening with '+' or '(' always start a number.
+    A long match holding fewer than two numbers is one long number (e.g. a card
+    number) rather than merged phones, so nothing is returned for it.
+    """
+    if len(normalize_phone(phone)) <= MAX_PHONE_DIGITS:
+        return [phone] if is_valid_phone(phone) else []
+    
+    groups = list(PHONE_GROUP_RE.finditer(phone))
+    # best[i] = (numbers found, -digits used, spans) for groups[i:]
+    best = [(0, 0, [])] * (len(groups) + 1)
+    for i in range(len(groups) - 1, -1, -1):
+        starts_number = groups[i].group()[0] in '+('
+        runs = []
+        digits = 0
+        for j in range(i, len(groups)):
+            if j > i and groups[j].group()[0] in '+(':
+                break
+            digits += len(normalize_phone(groups[j].group()))
+            if digits > MAX_PHONE_DIGITS:
+                break
+            if digits >= MIN_PHONE_DIGITS:
+                count, used, spans = best[j + 1]
+                runs.append((count + 1, used - digits, [(groups[i].start(), groups[j].end())] + spans))
+        candidates = runs if starts_number and runs else runs + [best[i + 1]]
+        best[i] = max(candidates, key=lambda c: c[:2])
+    
+    count, _, spans = best[0]
+    return [phone[s:e] for s, e in spans] if count >= 2 else []
+
 @dataclass
 class ExtractedInfo:
     phones: List[str]
@@ -11,10 +70,53 @@ class ExtractedInfo:
     names: List[str]
 
 class InfoExtractor:
-    def __init__(self):
-        self.nlp = spacy.load("en_core_web_sm")
-        self.phone_regex = re.compile(r'[\+\(]?[0-9][0-9\-\(\)\s]{8,}[0-9]')
-        self.email_regex = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+    def __init__(self, ner_model_path: Optional[str] = None, ner_batch_size: int = 16):
+        """Load the name recognizer.
+        
+        Args:
+            ner_model_path: Directory with an int8 ONNX export of dslim/bert-base-NER.
+                Uses spaCy's en_core_web_sm when not given or if loading fails.
+            ner_batch_size: Sentences per forward pass for the ONNX model
+        """
+        self.ner = None
+        self.ner_batch_size = ner_batch_size
+        if ner_model_path:
+            try:
+                self.ner = self._load_onnx_ner(ner_model_path)
+            except Exception as e:
+                logger.warning(f"ONNX NER unavailable, using spaCy: {e}")
+        
+        if self.ner is None:
+            # Only NER is needed for PERSON entities; it has its own internal tok2vec
+            self.nlp = spacy.load(
+                "en_core_web_sm",
+                disable=["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer"]
+            )
+
+    def _load_onnx_ner(self, model_path: str):
+        """Build a token classification pipeline on ONNX Runtime."""
+        from optimum.onnxruntime import ORTModelForTokenClassification
+        from transformers import AutoTokenizer, pipeline
+        
+        model = ORTModelForTokenClassification.from_pretrained(
+            model_path, file_name="model_quantized.onnx"
+        )
+        tokenizer = AutoTokenizer.from_pretrained(model_path)
+        logger.info(f"Loaded ONNX NER model from {model_path}")
+        return pipeline("ner", model=model, tokenizer=tokenizer, aggregation_strategy="simple")
+
+    def _extract_names(self, text: str) -> List[str]:
+        """Find PERSON entities in text."""
+        if self.ner is None:
+            doc = self.nlp(text)
+            return [ent.text for ent in doc.ents if ent.label_ == "PERSON"]
+        
+        # One batched pass over the transcript's sentences
+        sentences = [s for s in SENTENCE_END_RE.split(text) if s.strip()]
+        if not sentences:
+            return []
+        results = self.ner(sentences, batch_size=self.ner_batch_size)
+        return [ent["word"] for ents in results for ent in ents if ent["entity_group"] == "PER"]
 
     def extract(self, text: str) -> ExtractedInfo:
         """Extract structured info from text.
@@ -25,10 +127,13 @@ class InfoExtractor:
         Returns:
             ExtractedInfo dataclass with results
         """
-        phones = self.phone_regex.findall(text)
-        emails = self.email_regex.findall(text)
-        doc = self.nlp(text)
-        names = [ent.text for ent in doc.ents if ent.label_ == "PERSON"]
+        phones, emails = [], []
+        for match in CONTACT_RE.finditer(text):
+            if match.lastgroup == "email":
+                emails.append(match.group())
+            else:
+                phones.extend(split_phones(match.group()))
+        names = self._extract_names(text)
         
         return ExtractedInfo(
             phones=phones,
@@ -1,22 +1,63 @@
-import whisper
-from typing import Optional, Callable
+from faster_whisper import WhisperModel, BatchedInferencePipeline, decode_audio
+from typing import Optional, Callable, Iterator, Tuple
 import logging
+import os
+import time
+import numpy as np
 import torch
-from tqdm import tqdm
 
 logger = logging.getLogger(__name__)
 
+PROGRESS_MIN_INTERVAL = 0.1  # seconds between progress callbacks
+PROGRESS_MIN_DELTA = 0.01
+
+SAMPLE_RATE = 16000
+SPECULATIVE_MODEL = "openai/whisper-large-v2"
+SPECULATIVE_ASSISTANT = "distil-whisper/distil-large-v2"
+COMPILE_WARMUP_RUNS = 3  # CUDA graphs are recorded after a few calls with matching shapes
+
+def available_cpus() -> int:
+    """Count CPUs this process may run on, respecting affinity where supported."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 0
+
 class AudioTranscriber:
-    def __init__(self, model_size: str = "base", device: str = "auto"):
+    def __init__(self, model_size: str = "base", device: str = "auto",
+                 batch_size: Optional[int] = None, speculative: bool = False):
         """Initialize Whisper model with enhanced configuration.
         
         Args:
             model_size: Whisper model size (tiny, base, small, medium)
             device: Compute device ('auto', 'cpu', or 'cuda')
+            batch_size: Audio chunks decoded per batch (default: 4 on CPU, 16 on CUDA)
+            speculative: Use whisper-large-v2 with a distil-whisper draft model instead of
+                model_size (CUDA only, falls back to faster-whisper otherwise). This backend
+                decodes the whole file in one generate call, without VAD batching or
+                per-segment streaming.
         """
         self.device = self._determine_device(device)
-        self.model = self._load_model(model_size)
+        self.batch_size = batch_size or (16 if self.device == "cuda" else 4)
         self.progress_callback = None
+        self._last_prog_time = 0.0
+        self._last_prog = 0.0
+        self.backend = "faster-whisper"
+        
+        if speculative:
+            if self.device == "cuda":
+                try:
+                    self._load_speculative_model()
+                    self.backend = "transformers"
+                except Exception as e:
+                    logger.warning(f"Speculative decoding unavailable, using faster-whisper: {e}")
+            else:
+                logger.info("Speculative decoding requires CUDA, using faster-whisper")
+        
+        if self.backend == "faster-whisper":
+            self.model = self._load_model(model_size)
+            self.batched = BatchedInferencePipeline(model=self.model)
+        
+        self._warm_up()
 
     def _determine_device(self, device: str) -> str:
         """Automatically select the best available device."""
@@ -24,30 +65,186 @@ class AudioTranscriber:
             return "cuda" if torch.cuda.is_available() else "cpu"
         return device
 
-    def _load_model(self, model_size: str):
+    def _load_model(self, model_size: str) -> WhisperModel:
         """Load model with optimized settings."""
-        logger.info(f"Loading {model_size} model for {self.device.upper()}")
-        model = whisper.load_model(model_size, device=self.device)
+        # int8 weights on CPU, FP16 kernels on GPU
+        compute_type = "int8" if self.device == "cpu" else "float16"
+        # Give batched chunk decoding every available core instead of CTranslate2's default of 4
+        cpu_threads = available_cpus() if self.device == "cpu" else 0
+        logger.info(f"Loading {model_size} model for {self.device.upper()} ({compute_type})")
+        return WhisperModel(
+            model_size,
+            device=self.device,
+            compute_type=compute_type,
+            cpu_threads=cpu_threads
+        )
+
+    def _warm_up(self):
+        """Run one pass over 30s of silence so kernel selection/autotune happens at load time."""
+        dummy = np.zeros(SAMPLE_RATE * 30, dtype=np.float32)
+        try:
+            if self.backend == "transformers":
+                inputs = self.processor(dummy, sampling_rate=SAMPLE_RATE, return_tensors="pt")
+                input_features = inputs.input_features.to(self.device, dtype=torch.float16)
+                with torch.inference_mode():
+                    for _ in range(COMPILE_WARMUP_RUNS):
+                        self.model.generate(
+                            input_features,
+                            assistant_model=self.assistant_model,
+                            max_new_tokens=4
+                        )
+            else:
+                segments, _ = self.model.transcribe(dummy, beam_size=1)
+                list(segments)  # Segments are lazy, consume to run the model
+            logger.info("Model warm-up complete")
+        except Exception as e:
+            logger.warning(f"Model warm-up failed: {e}")
+
+    def _load_speculative_model(self):
+        """Load HF Whisper with a distil-whisper assistant for speculative decoding.
         
-        # Optimize for CPU if needed
-        if self.device == "cpu":
-            model = model.float()  # Force FP32
-            logger.info("Optimized for CPU execution (FP32)")
+        Weights are read from memory-mapped safetensors files, so loading avoids an
+        extra in-RAM copy of the checkpoint.
+        """
+        from transformers import (AutoModelForCausalLM, AutoProcessor,
+                                  WhisperForConditionalGeneration)
         
-        return model
+        logger.info(f"Loading {SPECULATIVE_MODEL} with {SPECULATIVE_ASSISTANT} draft model (FP16)")
+        self.processor = AutoProcessor.from_pretrained(SPECULATIVE_MODEL)
+        self.model = WhisperForConditionalGeneration.from_pretrained(
+            SPECULATIVE_MODEL, torch_dtype=torch.float16, use_safetensors=True
+        ).to(self.device)
+        self.assistant_model = AutoModelForCausalLM.from_pretrained(
+            SPECULATIVE_ASSISTANT, torch_dtype=torch.float16, use_safetensors=True
+        ).to(self.device)
+        self._compile_encoder()
+
+    def _compile_encoder(self):
+        """Compile the Whisper encoder into CUDA graphs.
+        
+        The encoder always sees fixed (1, 80, 3000) windows, so it is a good fit for
+        mode="reduce-overhead". The decoder keeps the dynamic KV cache because
+        assisted generation does not support the static cache.
+        """
+        encoder = self.model.get_encoder()
+        eager_forward = encoder.forward
+        try:
+            torch._inductor.config.coordinate_descent_tuning = True
+            encoder.forward = torch.compile(eager_forward, mode="reduce-overhead", fullgraph=True)
+            # Compilation is lazy, so run the encoder once to surface compile errors here
+            dummy = torch.zeros(1, self.model.config.num_mel_bins, 3000,
+                                device=self.device, dtype=torch.float16)
+            with torch.inference_mode():
+                encoder(dummy)
+            logger.info("Compiled Whisper encoder with torch.compile")
+        except Exception as e:
+            encoder.forward = eager_forward
+            logger.warning(f"torch.compile failed, running eager: {e}")
+
+    def _load_audio(self, audio_path: str) -> np.ndarray:
+        """Decode audio to 16kHz mono, resampling on the GPU when torchaudio is available."""
+        try:
+            import torchaudio
+            wav, sr = torchaudio.load(audio_path)
+        except Exception as e:
+            # Missing torchaudio or no backend for this format; PyAV decodes it on CPU
+            logger.info(f"torchaudio decode unavailable, using PyAV: {e}")
+            return decode_audio(audio_path, sampling_rate=SAMPLE_RATE)
+        
+        wav = wav.mean(0).to(self.device)
+        if sr != SAMPLE_RATE:
+            wav = torchaudio.functional.resample(wav, sr, SAMPLE_RATE)
+        return wav.cpu().numpy()
+
+    def _transcribe_speculative(self, audio_path: str, language: Optional[str]) -> str:
+        """Transcribe with the draft model proposing tokens for the main model to verify."""
+        audio = self._load_audio(audio_path)
+        if len(audio) < 30 * SAMPLE_RATE:
+            # Short-form audio must be padded to Whisper's 30s window
+            inputs = self.processor(audio, sampling_rate=SAMPLE_RATE, return_tensors="pt",
+                                    return_attention_mask=True)
+        else:
+            inputs = self.processor(
+                audio, sampling_rate=SAMPLE_RATE, return_tensors="pt",
+                truncation=False, padding="longest", return_attention_mask=True
+            )
+        input_features = inputs.input_features.to(self.device, dtype=torch.float16)
+        attention_mask = inputs.attention_mask.to(self.device)
+        
+        self._update_progress(0.5)
+        with torch.inference_mode():
+            tokens = self.model.generate(
+                input_features,
+                attention_mask=attention_mask,
+                assistant_model=self.assistant_model,
+                language=language
+            )
+        return self.processor.batch_decode(tokens, skip_special_tokens=True)[0]
 
     def set_progress_callback(self, callback: Callable[[float], None]):
         """Set a progress callback function (0.0 to 1.0)."""
         self.progress_callback = callback
 
     def _update_progress(self, progress: float):
-        """Handle progress updates safely."""
+        """Handle progress updates safely, throttled so UI callbacks stay cheap."""
         if self.progress_callback:
+            progress = min(1.0, max(0.0, progress))
+            now = time.monotonic()
+            # Skip only updates that are both too soon and too small to be visible
+            if progress < 1.0 and (now - self._last_prog_time < PROGRESS_MIN_INTERVAL
+                                   and abs(progress - self._last_prog) < PROGRESS_MIN_DELTA):
+                return
+            self._last_prog_time = now
+            self._last_prog = progress
             try:
-                self.progress_callback(min(1.0, max(0.0, progress)))
+                self.progress_callback(progress)
             except Exception as e:
                 logger.warning(f"Progress callback failed: {e}")
 
+    def transcribe_iter(self, audio_path: str,
+                        language: Optional[str] = None) -> Iterator[Tuple[float, str]]:
+        """Stream transcription as segments are decoded.
+        
+        Args:
+            audio_path: Path to audio file
+            language: Optional language code (en, fr, etc.)
+            
+        Yields:
+            (progress, text) tuples, progress also sent to the progress callback
+        """
+        self._last_prog_time = 0.0  # Always report the first update of a run
+        self._update_progress(0.1)  # Initialization
+        
+        if self.backend == "transformers":
+            # Speculative decoding produces the whole transcript in one generate call
+            text = self._transcribe_speculative(audio_path, language)
+            self._update_progress(0.9)
+            yield 0.9, text
+            return
+        
+        # faster-whisper handles audio decoding, mel features and language detection.
+        # VAD splits the audio into speech chunks which are decoded in batches.
+        self._update_progress(0.2)
+        segments, info = self.batched.transcribe(
+            audio_path,
+            language=language,
+            vad_filter=True,
+            vad_parameters={"min_silence_duration_ms": 500},
+            beam_size=1,
+            batch_size=self.batch_size
+        )
+        if language is None:
+            logger.info(f"Detected language: {info.language}")
+        
+        # Segments are generated lazily - decoding happens here
+        self._update_progress(0.5)
+        for seg in segments:
+            progress = 0.5 + 0.4 * seg.end / info.duration if info.duration else 0.5
+            self._update_progress(progress)
+            yield progress, seg.text
+        
+        self._update_progress(0.9)
+
     def transcribe(self, audio_path: str, language: Optional[str] = None) -> Optional[str]:
         """Enhanced audio transcription with progress tracking.
         
@@ -59,34 +256,9 @@ class AudioTranscriber:
             Transcribed text or None if error
         """
         try:
-            self._update_progress(0.1)  # Initialization
-            
-            # Load audio with progress
-            self._update_progress(0.2)
-            audio = whisper.load_audio(audio_path)
-            audio = whisper.pad_or_trim(audio)
-            
-            # Mel spectrogram
-            self._update_progress(0.3)
-            mel = whisper.log_mel_spectrogram(audio).to(self.model.device)
-            
-            # Detect language if not specified
-            self._update_progress(0.4)
-            if language is None:
-                _, probs = self.model.detect_language(mel)
-                language = max(probs, key=probs.get)
-                logger.info(f"Detected language: {language}")
-            
-            # Decode with simulated progress
-            self._update_progress(0.5)
-            options = whisper.DecodingOptions(language=language, fp16=(self.device != "cpu"))
-            
-            with tqdm(total=100, disable=(self.progress_callback is not None)) as pbar:
-                result = self.model.transcribe(audio_path, decoding_options=options)
-                pbar.update(100)
-            
-            self._update_progress(0.9)
-            return result["text"]
+            # join() sizes the result in one pass over a list, not a generator
+            parts = [text for _, text in self.transcribe_iter(audio_path, language)]
+            return "".join(parts)
             
         except FileNotFoundError:
             logger.error(f"Audio file not found: {audio_path}")